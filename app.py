@@ -3,7 +3,6 @@ import streamlit as st
 import faiss
 from sentence_transformers import SentenceTransformer
 import numpy as np
-import requests
 import logging
 import sys
 
@@ -13,10 +12,11 @@ with open("style.css") as f:
 
 from db_utils import save_faiss_index, load_faiss_index, save_docs_and_embeddings, load_docs_and_embeddings
 from file_utils import save_uploaded_file, extract_text_from_file, SUPPORTED_TEXT, SUPPORTED_PDF, SUPPORTED_AUDIO
-from persona_utils import construct_persona_from_intro
+from persona_utils import construct_persona_from_intro, get_llm_suggested_questions
+from prompt_utils import PromptCache, TONE_OPTIONS, build_user_prompt
+from groq_utils import GROQ_API_URL, groq_chat_completion
 
 
-GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"  # Placeholder, update as needed
 GROQ_API_KEY = st.secrets["GROQ_API_KEY"]
 GROQ_API_KEY_2 = st.secrets.get("GROQ_API_KEY_2")
 
@@ -33,17 +33,6 @@ if os.path.exists(image_path):
     st.sidebar.image(image_path, caption="This is Ilanri!", use_container_width=True)
 
 # --- Context Switch: Tone Selector ---
-TONE_OPTIONS = {
-    "Interview Mode": "Answer concisely, professionally, and highlight achievements as if in a job interview.",
-    "Fast Facts": "Answer in bullet points or TL;DR style for quick reference.",
-    "Mentor Mode": "Answer like a helpful mentor—encouraging, insightful, and guiding.",
-    "Playful Mode": "Answer with light humor, metaphors, or fun comparisons while staying informative.",
-    "Casual Chat": "Answer like you would in a relaxed conversation with a peer—natural, friendly, and relatable.",
-    "Debug Mode": "Answer step-by-step, like explaining your reasoning while debugging code.",
-    "Analogy Mode": "Always explain with analogies and metaphors.",
-    "Concise": "Answer as briefly and to the point as possible, with no extra fluff."
-}
-
 st.sidebar.markdown("## Choose Response Tone")
 selected_tone = st.sidebar.radio(
     "",
@@ -78,23 +67,15 @@ logging.getLogger("watchdog").setLevel(logging.ERROR)
 logging.getLogger("tornado").setLevel(logging.ERROR)
 logging.getLogger("urllib3").setLevel(logging.ERROR)
 
-def get_or_create_persona():
-    logger.debug("Loading or generating persona...")
-    # If persona already constructed and cached, use it
-    if os.path.exists(PERSONA_CACHE_FILE):
-        with open(PERSONA_CACHE_FILE, "r", encoding="utf-8") as f:
-            logger.info("Loaded persona from cache.")
-            return f.read().strip()
-    # Otherwise, construct persona from intro.txt using LLM
-    if os.path.exists(INTRO_FILE):
-        with open(INTRO_FILE, "r", encoding="utf-8") as f:
-            intro_text = f.read().strip()
-        persona = construct_persona_from_intro(intro_text, GROQ_API_URL, GROQ_API_KEY)
-        with open(PERSONA_CACHE_FILE, "w", encoding="utf-8") as f:
-            f.write(persona)
-        logger.info("Persona constructed and cached.")
-        return persona
-    return ""
+@st.cache_resource
+def get_prompt_cache():
+    # Shared across sessions: persona, per-tone system prompts and the suggested question pool
+    return PromptCache(
+        INTRO_FILE,
+        PERSONA_CACHE_FILE,
+        persona_builder=lambda intro_text: construct_persona_from_intro(intro_text, GROQ_API_URL, GROQ_API_KEY),
+        question_generator=lambda persona, n: get_llm_suggested_questions(persona, GROQ_API_URL, GROQ_API_KEY, n),
+    )
 
 FAISS_INDEX_PATH = os.path.join(DB_DIR, "faiss.index")
 DOCS_EMB_PATH = os.path.join(DB_DIR, "docs_emb.pkl")
@@ -121,42 +102,12 @@ def create_faiss_index(embeddings):
 
 def groq_chat(prompt, context=""):
     logger.debug(f"Calling Groq LLM with prompt: {prompt[:100]}... and context length: {len(context)}")
-    persona = get_or_create_persona()
     # Get selected tone from session state (set by sidebar radio)
     tone = st.session_state.get("tone_selector", "Friendly")
-    tone_instruction = TONE_OPTIONS.get(tone, "")
-    # Compose system prompt: persona + tone
-    if persona:
-        system_prompt = f"{persona}\n\n{tone_instruction}"
-    else:
-        system_prompt = f"You are the person the questions are about.\n\n{tone_instruction}"
-    user_prompt = f"{prompt}\n\nUse the following context to answer the question in first person. Strictly stay within the provided context.\n{context}"
-
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    data = {
-        "model": "llama-3.3-70b-versatile",  # Example model name, update as needed
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-    }
-    response = requests.post(GROQ_API_URL, headers=headers, json=data)
-    if response.status_code == 200:
-        logger.info("Groq LLM call successful.")
-        return response.json()['choices'][0]['message']['content']
-    elif GROQ_API_KEY_2:
-        logger.warning(f"Groq API key 1 failed ({response.status_code}). Trying fallback key.")
-        headers["Authorization"] = f"Bearer {GROQ_API_KEY_2}"
-        response2 = requests.post(GROQ_API_URL, headers=headers, json=data)
-        if response2.status_code == 200:
-            logger.info("Groq LLM call successful with fallback key.")
-            return response2.json()['choices'][0]['message']['content']
-        else:
-            logger.error(f"Groq API error (fallback): {response2.status_code} - {response2.text}")
-            return f"[Groq API error (fallback): {response2.status_code}] - {response2.text}"
-    else:
-        logger.error(f"Groq API error: {response.status_code} - {response.text}")
-        return f"[Groq API error: {response.status_code}] - {response.text}"
+    # System prompt (persona + tone) is precomputed per tone
+    system_prompt = get_prompt_cache().get_system_prompt(tone)
+    user_prompt = build_user_prompt(prompt, context)
+    return groq_chat_completion(system_prompt, user_prompt, GROQ_API_URL, GROQ_API_KEY, GROQ_API_KEY_2)
 
 
 # Use accent color and heading font for title
@@ -359,56 +310,15 @@ if uploaded_files:
         st.success(f"Added and saved {len(new_chunks)} new chunks.")
 
 
-# --- LLM-generated suggested questions for Q&A section ---
-import json
-def get_llm_suggested_questions(persona, n=3):
-    logger.debug(f"Getting {n} LLM-suggested questions for persona: {persona[:50]}...")
-    prompt = (
-        f"You are a helpful assistant. Based on the following persona, suggest {n} personal, diverse, or random introspective, but short and fun questions that a user could add to a knowledge base as Q&A pairs. "
-        f"Return only a JSON list of questions.\n\nPersona:\n{persona}"
-    )
-    headers = {"Authorization": f"Bearer {GROQ_API_KEY}", "Content-Type": "application/json"}
-    data = {
-        "model": "llama-3.3-70b-versatile",
-        "messages": [
-            {"role": "system", "content": prompt}
-        ]
-    }
-    try:
-        response = requests.post(GROQ_API_URL, headers=headers, json=data, timeout=20)
-        if response.status_code == 200:
-            content = response.json()['choices'][0]['message']['content']
-            # Try to parse as JSON list
-            try:
-                questions = json.loads(content)
-                if isinstance(questions, list):
-                    return [str(q).strip() for q in questions][:n]
-            except Exception:
-                # Fallback: try to extract JSON array from text
-                import re
-                match = re.search(r'\[(.*?)\]', content, re.DOTALL)
-                if match:
-                    items = match.group(1).split(',')
-                    return [item.strip(' "\n') for item in items if item.strip()][:n]
-                # Fallback: split by lines
-                return [line.strip('- ').strip() for line in content.split('\n') if line.strip()][:n]
-        else:
-            return ["What is a good question to add?", "What is a useful fact?", "What is a common FAQ?"]
-    except Exception:
-        return ["What is a good question to add?", "What is a useful fact?", "What is a common FAQ?"]
-
-
 # Initialize or refresh suggested questions
 if 'suggested_questions' not in st.session_state or st.session_state.get('refresh_suggested', True):
-    persona = get_or_create_persona()
-    st.session_state.suggested_questions = get_llm_suggested_questions(persona)
+    st.session_state.suggested_questions = get_prompt_cache().get_suggested_questions()
     st.session_state.refresh_suggested = False
 
 # Function to update suggested questions after Q&A is added
 def update_suggested_questions_qa(latest_answer=None):
     logger.debug("Updating suggested questions after new answer.")
-    persona = get_or_create_persona()
-    st.session_state.suggested_questions = get_llm_suggested_questions(persona)
+    st.session_state.suggested_questions = get_prompt_cache().get_suggested_questions()
 
 suggestion_cols = st.columns(len(st.session_state.suggested_questions))
 for i, q in enumerate(st.session_state.suggested_questions):
@@ -0,0 +1,214 @@
+"""
+Batch question answering for evaluation sets and FAQ pre-generation.
+
+Usage:
+    python batch_qa.py questions.jsonl answers.jsonl [--tone "Fast Facts"] [--k 10] [--workers 4] [--rpm 30] [--timeout 60]
+
+Each input line is a JSON object with a "question" and optionally an "id" and a "tone".
+Each output line holds the answer, the retrieved chunk ids and the timings for one question;
+lines are written as questions complete, so they are not in input order.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from sentence_transformers import SentenceTransformer
+
+from db_utils import load_faiss_index, load_docs_and_embeddings
+from persona_utils import construct_persona_from_intro
+from prompt_utils import PromptCache, TONE_OPTIONS, build_user_prompt
+from groq_utils import GROQ_API_URL, GROQ_TIMEOUT, groq_chat_completion
+
+DB_DIR = "db"
+INTRO_FILE = os.path.join(DB_DIR, "intro.txt")
+PERSONA_CACHE_FILE = os.path.join(DB_DIR, "persona_prompt.txt")
+FAISS_INDEX_PATH = os.path.join(DB_DIR, "faiss.index")
+DOCS_EMB_PATH = os.path.join(DB_DIR, "docs_emb.pkl")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+DEBUG = os.environ.get("DEBUG", "0") == "1"
+logger = logging.getLogger("batch_qa")
+
+
+class RateLimiter:
+    """Spaces out calls so that at most `per_minute` start in any minute."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def load_questions(path: str, default_tone: str) -> list:
+    """
+    Read questions from a JSONL file, filling in missing tones and using the line number as missing id.
+    Raises ValueError on duplicate ids, since output lines are matched to questions by id.
+    """
+    questions = []
+    seen_ids = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not str(item.get("question", "")).strip():
+                raise ValueError(f"Missing question on line {line_no} of {path}")
+            tone = item.get("tone") or default_tone
+            if tone not in TONE_OPTIONS:
+                logger.warning(f"Unknown tone '{tone}' on line {line_no}; no tone instruction will be used.")
+            question_id = item.get("id", line_no)
+            if json.dumps(question_id) in seen_ids:
+                raise ValueError(f"Duplicate id {question_id!r} on line {line_no} of {path}")
+            seen_ids.add(json.dumps(question_id))
+            questions.append({"id": question_id, "question": str(item["question"]).strip(), "tone": tone})
+    logger.info(f"Loaded {len(questions)} questions from {path}")
+    return questions
+
+
+def retrieve_contexts_batch(queries, model, index, docs, k=10):
+    """
+    Embed all queries in one encode call and search the index once.
+    Returns (chunk_ids per query, embed seconds, search seconds).
+    """
+    start = time.perf_counter()
+    query_embs = model.encode(queries, show_progress_bar=False)
+    embed_s = time.perf_counter() - start
+    start = time.perf_counter()
+    _, I = index.search(query_embs, k)
+    search_s = time.perf_counter() - start
+    # FAISS pads with -1 when the index holds fewer than k vectors
+    chunk_ids = [[int(i) for i in row if 0 <= i < len(docs)] for row in I]
+    logger.info(f"Retrieved context for {len(queries)} queries (embed {embed_s:.3f}s, search {search_s:.3f}s)")
+    return chunk_ids, embed_s, search_s
+
+
+def answer_batch(questions, model, index, docs, prompt_cache, api_key, fallback_api_key=None, k=10, workers=4, per_minute=30,
+                 timeout=GROQ_TIMEOUT):
+    """
+    Answer all questions, issuing the LLM calls concurrently under a rate limit.
+    Yields one result per question as soon as it completes; a failing question yields a result with an "error".
+    """
+    if not questions:
+        return
+    chunk_ids, embed_s, search_s = retrieve_contexts_batch([q["question"] for q in questions], model, index, docs, k)
+    # Resolve the persona once before the worker threads start asking for system prompts
+    prompt_cache.get_persona()
+    limiter = RateLimiter(per_minute)
+    # requests.Session is not guaranteed to be thread-safe, so each worker gets its own
+    local = threading.local()
+
+    def answer_one(item, ids):
+        start = time.perf_counter()
+        waits = []
+        error = None
+
+        def wait_for_slot():
+            wait_start = time.perf_counter()
+            limiter.wait()
+            waits.append(time.perf_counter() - wait_start)
+
+        try:
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            system_prompt = prompt_cache.get_system_prompt(item["tone"])
+            user_prompt = build_user_prompt(item["question"], "\n".join(docs[i] for i in ids))
+            wait_for_slot()
+            start = time.perf_counter()
+            answer = groq_chat_completion(system_prompt, user_prompt, GROQ_API_URL, api_key, fallback_api_key,
+                                          session=local.session, timeout=timeout, before_retry=wait_for_slot)
+            if answer.startswith("[Groq API error"):
+                error = answer
+        except Exception as e:
+            logger.error(f"Failed to answer question {item['id']}: {e}")
+            error = str(e)
+            answer = f"[Error: {e}]"
+        # A fallback-key retry waits for the limiter inside the timed call; that wait is reported separately
+        llm_s = time.perf_counter() - start - sum(waits[1:])
+        result = {
+            "id": item["id"],
+            "question": item["question"],
+            "tone": item["tone"],
+            "answer": answer,
+            "chunk_ids": ids,
+            # Embedding and search run once for the whole batch; the per-question share is reported
+            "timings": {
+                "embed_s": embed_s / len(questions),
+                "search_s": search_s / len(questions),
+                "llm_s": llm_s,
+                "rate_limit_wait_s": sum(waits),
+            },
+        }
+        if error is not None:
+            result["error"] = error
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = [executor.submit(answer_one, item, ids) for item, ids in zip(questions, chunk_ids)]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def write_result(f, result):
+    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    # Flush so answers already paid for survive an interrupted run
+    f.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions against the knowledge base.")
+    parser.add_argument("input", help="JSONL file with one {\"question\", \"tone\"?, \"id\"?} object per line")
+    parser.add_argument("output", help="JSONL file to write answers, chunk ids and timings to")
+    parser.add_argument("--tone", default=next(iter(TONE_OPTIONS)), help="Tone for questions without one")
+    parser.add_argument("--k", type=int, default=10, help="Number of context chunks to retrieve per question")
+    parser.add_argument("--workers", type=int, default=4, help="Number of concurrent LLM calls")
+    parser.add_argument("--rpm", type=float, default=30, help="Maximum LLM calls started per minute, including fallback-key retries (0 for no limit)")
+    parser.add_argument("--timeout", type=float, default=GROQ_TIMEOUT, help="Timeout in seconds for each LLM request")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if DEBUG else logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    api_key = os.getenv("GROQ_API_KEY", "")
+    fallback_api_key = os.getenv("GROQ_API_KEY_2")
+    if not api_key:
+        parser.error("GROQ_API_KEY environment variable is not set")
+
+    questions = load_questions(args.input, args.tone)
+    docs, _ = load_docs_and_embeddings(DOCS_EMB_PATH)
+    index = load_faiss_index(FAISS_INDEX_PATH)
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    prompt_cache = PromptCache(
+        INTRO_FILE,
+        PERSONA_CACHE_FILE,
+        persona_builder=lambda intro_text: construct_persona_from_intro(intro_text, GROQ_API_URL, api_key),
+    )
+
+    start = time.perf_counter()
+    answered, failed = 0, 0
+    with open(args.output, "w", encoding="utf-8") as f:
+        for result in answer_batch(questions, model, index, docs, prompt_cache, api_key, fallback_api_key,
+                                   k=args.k, workers=args.workers, per_minute=args.rpm, timeout=args.timeout):
+            write_result(f, result)
+            answered += 1
+            failed += "error" in result
+    logger.info(f"Answered {answered} questions ({failed} failed) in {time.perf_counter() - start:.1f}s; wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
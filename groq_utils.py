@@ -0,0 +1,47 @@
+import requests
+import os
+import logging
+
+GROQ_API_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_TIMEOUT = 60
+
+DEBUG = os.environ.get("DEBUG", "0") == "1"
+logger = logging.getLogger("groq_utils")
+
+def groq_chat_completion(system_prompt: str, user_prompt: str, api_url: str, api_key: str, fallback_api_key: str = None,
+                         session=None, timeout: float = GROQ_TIMEOUT, before_retry=None) -> str:
+    """
+    Send a system + user prompt to the Groq chat completions API.
+    Retries once with fallback_api_key if the first call fails; before_retry is called before that
+    second request (e.g. to rate-limit it).
+    Returns the answer text, or an error string starting with "[Groq API error".
+    """
+    http = session or requests
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    data = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+    }
+    response = http.post(api_url, headers=headers, json=data, timeout=timeout)
+    if response.status_code == 200:
+        logger.info("Groq LLM call successful.")
+        return response.json()['choices'][0]['message']['content']
+    elif fallback_api_key:
+        logger.warning(f"Groq API key 1 failed ({response.status_code}). Trying fallback key.")
+        headers["Authorization"] = f"Bearer {fallback_api_key}"
+        if before_retry:
+            before_retry()
+        response2 = http.post(api_url, headers=headers, json=data, timeout=timeout)
+        if response2.status_code == 200:
+            logger.info("Groq LLM call successful with fallback key.")
+            return response2.json()['choices'][0]['message']['content']
+        else:
+            logger.error(f"Groq API error (fallback): {response2.status_code} - {response2.text}")
+            return f"[Groq API error (fallback): {response2.status_code}] - {response2.text}"
+    else:
+        logger.error(f"Groq API error: {response.status_code} - {response.text}")
+        return f"[Groq API error: {response.status_code}] - {response.text}"
@@ -1,14 +1,18 @@
 import requests
 import os
+import re
+import json
 import logging
 
+from prompt_utils import DEFAULT_SUGGESTED_QUESTIONS
+
 DEBUG = os.environ.get("DEBUG", "0") == "1"
 logger = logging.getLogger("persona_utils")
 
-def construct_persona_from_intro(intro_text, llm_api_url, llm_api_key):
+def construct_persona_from_intro(intro_text, llm_api_url, llm_api_key, timeout=30):
     """
     Use the LLM to generate a persona description from the intro text.
-    Returns a concise persona prompt string.
+    Returns a concise persona prompt string, raises RuntimeError if the LLM call fails.
     """
     system_prompt = (
       "You are an expert at extracting personas and tone from background information. "
@@ -27,11 +31,49 @@ def construct_persona_from_intro(intro_text, llm_api_url, llm_api_key):
         ]
     }
     headers = {"Authorization": f"Bearer {llm_api_key}", "Content-Type": "application/json"}
-    response = requests.post(llm_api_url, headers=headers, json=data)
+    response = requests.post(llm_api_url, headers=headers, json=data, timeout=timeout)
     if response.status_code == 200:
         persona = response.json()['choices'][0]['message']['content']
         logger.info("Persona constructed from intro text.")
         return persona
     else:
         logger.error(f"Failed to construct persona from intro: {response.status_code}")
-        return f"[Persona construction error: {response.status_code}]"
+        raise RuntimeError(f"Persona construction error: {response.status_code}")
+
+def get_llm_suggested_questions(persona, llm_api_url, llm_api_key, n=3):
+    """
+    Use the LLM to suggest n questions for the Q&A section based on the persona.
+    Returns a list of question strings.
+    """
+    logger.debug(f"Getting {n} LLM-suggested questions for persona: {persona[:50]}...")
+    prompt = (
+        f"You are a helpful assistant. Based on the following persona, suggest {n} personal, diverse, or random introspective, but short and fun questions that a user could add to a knowledge base as Q&A pairs. "
+        f"Return only a JSON list of questions.\n\nPersona:\n{persona}"
+    )
+    headers = {"Authorization": f"Bearer {llm_api_key}", "Content-Type": "application/json"}
+    data = {
+        "model": "llama-3.3-70b-versatile",
+        "messages": [
+            {"role": "system", "content": prompt}
+        ]
+    }
+    try:
+        response = requests.post(llm_api_url, headers=headers, json=data, timeout=20)
+        if response.status_code == 200:
+            content = response.json()['choices'][0]['message']['content']
+            # Try to parse as JSON list
+            try:
+                questions = json.loads(content)
+                if isinstance(questions, list):
+                    return [str(q).strip() for q in questions][:n]
+            except Exception:
+                # Fallback: try to extract JSON array from text
+                match = re.search(r'\[(.*?)\]', content, re.DOTALL)
+                if match:
+                    items = match.group(1).split(',')
+                    return [item.strip(' "\n') for item in items if item.strip()][:n]
+                # Fallback: split by lines
+                return [line.strip('- ').strip() for line in content.split('\n') if line.strip()][:n]
+        return list(DEFAULT_SUGGESTED_QUESTIONS)
+    except Exception:
+        return list(DEFAULT_SUGGESTED_QUESTIONS)
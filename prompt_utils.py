@@ -0,0 +1,215 @@
+import os
+import threading
+import logging
+from collections import deque
+
+DEBUG = os.environ.get("DEBUG", "0") == "1"
+logger = logging.getLogger("prompt_utils")
+
+# Tone instructions appended to the persona in the system prompt
+TONE_OPTIONS = {
+    "Interview Mode": "Answer concisely, professionally, and highlight achievements as if in a job interview.",
+    "Fast Facts": "Answer in bullet points or TL;DR style for quick reference.",
+    "Mentor Mode": "Answer like a helpful mentor—encouraging, insightful, and guiding.",
+    "Playful Mode": "Answer with light humor, metaphors, or fun comparisons while staying informative.",
+    "Casual Chat": "Answer like you would in a relaxed conversation with a peer—natural, friendly, and relatable.",
+    "Debug Mode": "Answer step-by-step, like explaining your reasoning while debugging code.",
+    "Analogy Mode": "Always explain with analogies and metaphors.",
+    "Concise": "Answer as briefly and to the point as possible, with no extra fluff."
+}
+
+DEFAULT_SUGGESTED_QUESTIONS = ["What is a good question to add?", "What is a useful fact?", "What is a common FAQ?"]
+
+
+def build_system_prompt(persona: str, tone_instruction: str) -> str:
+    """Compose the system prompt from persona and tone instruction."""
+    if persona:
+        return f"{persona}\n\n{tone_instruction}"
+    return f"You are the person the questions are about.\n\n{tone_instruction}"
+
+
+def build_user_prompt(question: str, context: str) -> str:
+    """Compose the user prompt from the question and the retrieved context."""
+    return f"{question}\n\nUse the following context to answer the question in first person. Strictly stay within the provided context.\n{context}"
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+class PromptCache:
+    """
+    In-memory cache for prompt assembly.
+    Holds the persona, the system prompt for every tone and a pool of suggested questions.
+    The persona is regenerated whenever the modification time of intro_file changes;
+    the question pool is pre-generated and refilled on a background thread.
+    """
+
+    def __init__(self, intro_file, persona_cache_file, persona_builder, question_generator=None,
+                 tone_options=TONE_OPTIONS, pool_size=12, refill_threshold=6, refill_wait=10):
+        self.intro_file = intro_file
+        self.persona_cache_file = persona_cache_file
+        self.persona_builder = persona_builder
+        self.question_generator = question_generator
+        self.tone_options = tone_options
+        self.pool_size = pool_size
+        self.refill_threshold = refill_threshold
+        self.refill_wait = refill_wait
+        self._lock = threading.RLock()
+        self._persona_built = threading.Condition(self._lock)
+        self._pool_refilled = threading.Condition(self._lock)
+        self._persona = None
+        self._intro_mtime = None
+        self._building = False
+        self._system_prompts = {}
+        self._questions = deque()
+        self._refilling = False
+        if question_generator is not None:
+            # Load the persona and pre-generate the question pool without blocking the caller;
+            # _refilling is set up front so the first get_suggested_questions waits for this refill
+            self._refilling = True
+            threading.Thread(target=self._refill, daemon=True).start()
+
+    def _persona_is_stale(self) -> bool:
+        if self._persona is None:
+            return True
+        return _mtime(self.intro_file) != self._intro_mtime
+
+    def _set_persona(self, persona, intro_mtime):
+        """Swap in a new persona and its system prompts. Must be called with the lock held."""
+        changed = persona != self._persona
+        self._intro_mtime = intro_mtime
+        if not changed:
+            return
+        self._system_prompts = {
+            tone: build_system_prompt(persona, instruction)
+            for tone, instruction in self.tone_options.items()
+        }
+        self._persona = persona
+        logger.debug(f"Precomputed system prompts for {len(self._system_prompts)} tones.")
+        # Suggestions generated for the previous persona are no longer relevant
+        self._questions.clear()
+        self.refill_in_background()
+
+    def _build_persona(self):
+        """Construct the persona from intro_file and cache it. Returns None if the LLM call fails."""
+        try:
+            with open(self.intro_file, "r", encoding="utf-8") as f:
+                intro_text = f.read().strip()
+            persona = self.persona_builder(intro_text)
+            tmp_file = self.persona_cache_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                f.write(persona)
+            os.replace(tmp_file, self.persona_cache_file)
+            logger.info("Persona constructed from intro and cached.")
+            return persona
+        except Exception as e:
+            logger.error(f"Failed to construct persona from intro, keeping the previous one: {e}")
+            return None
+
+    def get_persona(self) -> str:
+        """
+        Return the current persona, regenerating it if intro_file changed.
+        While a regeneration is running the previous persona is returned.
+        """
+        with self._lock:
+            while self._building and self._persona is None:
+                self._persona_built.wait()
+            if self._building or not self._persona_is_stale():
+                return self._persona
+            intro_mtime = _mtime(self.intro_file)
+            # On first load the cached persona is trusted only if it is at least as new as intro_file;
+            # afterwards any change to intro_file regenerates it
+            cache_is_current = self._persona is None and intro_mtime <= _mtime(self.persona_cache_file)
+            intro_exists = os.path.exists(self.intro_file)
+            if (cache_is_current or not intro_exists) and os.path.exists(self.persona_cache_file):
+                with open(self.persona_cache_file, "r", encoding="utf-8") as f:
+                    self._set_persona(f.read().strip(), intro_mtime)
+                logger.info("Loaded persona from cache.")
+                return self._persona
+            if not intro_exists:
+                self._set_persona(self._persona or "", intro_mtime)
+                return self._persona
+            self._building = True
+        # The LLM call runs outside the lock so other sessions keep using the previous persona
+        persona = self._build_persona()
+        with self._lock:
+            self._building = False
+            # On failure the mtime is still recorded so the build is not retried until intro_file changes again
+            if persona is None:
+                persona = self._persona or ""
+            self._set_persona(persona, intro_mtime)
+            self._persona_built.notify_all()
+            return self._persona
+
+    def get_system_prompt(self, tone: str) -> str:
+        """Return the precomputed system prompt for the given tone."""
+        persona = self.get_persona()
+        with self._lock:
+            if tone in self._system_prompts:
+                return self._system_prompts[tone]
+        return build_system_prompt(persona, self.tone_options.get(tone, ""))
+
+    def _generate_questions(self, persona, n):
+        if self.question_generator is None:
+            return []
+        questions = self.question_generator(persona, n) or []
+        return [q for q in questions if q and q not in DEFAULT_SUGGESTED_QUESTIONS]
+
+    def _refill(self, persona=None):
+        questions = []
+        dropped = False
+        try:
+            if persona is None:
+                persona = self.get_persona()
+            questions = self._generate_questions(persona, self.pool_size)
+            with self._lock:
+                # Drop the batch if the persona changed while generating
+                dropped = persona != self._persona
+                if not dropped:
+                    self._questions.extend(q for q in questions if q not in self._questions)
+            logger.debug(f"Refilled suggested question pool with {len(questions)} questions.")
+        except Exception as e:
+            logger.error(f"Failed to refill suggested question pool: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+                self._pool_refilled.notify_all()
+                # A refill requested while this one was running was skipped, so start it now.
+                # An empty batch is not retried to avoid hammering a failing LLM.
+                retry = dropped or (questions and len(self._questions) < self.refill_threshold)
+        if retry:
+            self.refill_in_background()
+
+    def refill_in_background(self):
+        """Start a background refill of the question pool if it runs low."""
+        if self.question_generator is None:
+            return
+        persona = self.get_persona()
+        with self._lock:
+            if self._refilling or len(self._questions) >= self.refill_threshold:
+                return
+            self._refilling = True
+        threading.Thread(target=self._refill, args=(persona,), daemon=True).start()
+
+    def get_suggested_questions(self, n=3):
+        """
+        Take n suggested questions from the pool.
+        If the pool is empty, waits up to refill_wait seconds for a running refill;
+        only when no refill is running are n questions generated synchronously.
+        """
+        persona = self.get_persona()
+        with self._lock:
+            self._pool_refilled.wait_for(lambda: self._questions or not self._refilling, timeout=self.refill_wait)
+            taken = [self._questions.popleft() for _ in range(min(n, len(self._questions)))]
+            generate = not taken and not self._refilling
+        if generate:
+            try:
+                taken = self._generate_questions(persona, n)[:n]
+            except Exception as e:
+                logger.error(f"Failed to generate suggested questions: {e}")
+        self.refill_in_background()
+        return taken or DEFAULT_SUGGESTED_QUESTIONS[:n]